@@ -2,18 +2,21 @@ from flask import Flask, render_template, request, redirect, url_for, flash, ses
 import os
 import xml.etree.ElementTree as ET
 import requests
-import time
 import uuid
 import tempfile
 import random
+import threading
 from werkzeug.utils import secure_filename
 
-# Try to import Google Translate API
-try:
-    from google.cloud import translate_v2 as google_translate
-    GOOGLE_TRANSLATE_AVAILABLE = True
-except ImportError:
-    GOOGLE_TRANSLATE_AVAILABLE = False
+from translation_memory import (
+    DEFAULT_MEMORY_PATH, DEFAULT_REUSE_THRESHOLD, DEFAULT_SUGGEST_THRESHOLD,
+    load_memory, save_memory, add_translation, lookup, find_similar
+)
+from translation_pipeline import translate_sources
+from translation_api import (
+    GOOGLE_TRANSLATE_AVAILABLE, LIBRETRANSLATE_INSTANCES, REQUEST_TIMEOUT, TranslationError,
+    translate_text
+)
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
@@ -25,15 +28,6 @@ DEFAULT_SRC_LANG = "en"
 DEFAULT_TARGET_LANG = "ru"
 DEFAULT_FIELDS_TO_TRANSLATE = ["strName", "strDesc"]
 DEFAULT_API = "libretranslate"  # Changed default to LibreTranslate
-DEFAULT_MYMEMORY_API_URL = "https://api.mymemory.translated.net/get"
-
-# Multiple LibreTranslate instances to try
-LIBRETRANSLATE_INSTANCES = [
-    "https://libretranslate.de",
-    "https://translate.argosopentech.com",
-    "https://translate.terraprint.co",
-    "https://lt.vern.cc"
-]
 
 # Get a random instance to distribute load
 def get_libretranslate_instance():
@@ -42,9 +36,18 @@ def get_libretranslate_instance():
 DEFAULT_LIBRETRANSLATE_URL = f"{get_libretranslate_instance()}/translate"
 LIBRETRANSLATE_LANGUAGES_URL = f"{get_libretranslate_instance()}/languages"
 
-# Request timeout settings
-REQUEST_TIMEOUT = 10  # 10 seconds timeout for API requests
-MAX_RETRIES = 2      # Maximum retries for failed API requests
+# Translation memory shared by all requests, one per language pair
+TRANSLATION_MEMORY_PATH = os.environ.get('TRANSLATION_MEMORY_PATH', DEFAULT_MEMORY_PATH)
+MAX_SUGGESTIONS = 10  # Suggestions kept for the result page (stored in the session cookie)
+translation_memories = {}
+translation_memory_lock = threading.Lock()
+
+def get_translation_memory(src_lang, target_lang):
+    """Return the translation memory for a language pair, loading it on first use."""
+    key = (src_lang, target_lang)
+    if key not in translation_memories:
+        translation_memories[key] = load_memory(TRANSLATION_MEMORY_PATH, src_lang, target_lang)
+    return translation_memories[key]
 
 # Create upload folder if it doesn't exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -55,107 +58,6 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max upload size
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def translate_with_mymemory(text, src_lang, target_lang, api_url=DEFAULT_MYMEMORY_API_URL):
-    """Translate text using MyMemory Translation API."""
-    if not text or text.strip() == "":
-        return text
-    
-    params = {
-        'q': text,
-        'langpair': f'{src_lang}|{target_lang}'
-    }
-    
-    try:
-        response = requests.get(api_url, params=params, timeout=REQUEST_TIMEOUT)
-        response_json = response.json()
-        
-        if response.status_code == 200 and response_json['responseStatus'] == 200:
-            translated_text = response_json['responseData']['translatedText']
-            return translated_text
-        else:
-            app.logger.error(f"Translation error: {response_json.get('responseDetails', 'Unknown error')}")
-            return text
-    except Exception as e:
-        app.logger.error(f"Error during translation: {str(e)}")
-        return text
-
-def translate_with_libretranslate(text, src_lang, target_lang, retry_count=0):
-    """Translate text using LibreTranslate API with retries and fallbacks."""
-    if not text or text.strip() == "":
-        return text
-    
-    # If we've reached max retries, fall back to MyMemory
-    if retry_count > MAX_RETRIES:
-        app.logger.warning("LibreTranslate failed after maximum retries, falling back to MyMemory")
-        return translate_with_mymemory(text, src_lang, target_lang)
-    
-    # Select a different instance on each retry
-    instance = LIBRETRANSLATE_INSTANCES[retry_count % len(LIBRETRANSLATE_INSTANCES)]
-    api_url = f"{instance}/translate"
-    
-    payload = {
-        "q": text,
-        "source": src_lang,
-        "target": target_lang,
-        "format": "text"
-    }
-    
-    try:
-        response = requests.post(api_url, json=payload, timeout=REQUEST_TIMEOUT)
-        response_json = response.json()
-        
-        if response.status_code == 200 and "translatedText" in response_json:
-            return response_json["translatedText"]
-        else:
-            error_msg = response_json.get('error', 'Unknown error')
-            app.logger.error(f"LibreTranslate error from {instance}: {error_msg}")
-            
-            # Try another instance
-            return translate_with_libretranslate(text, src_lang, target_lang, retry_count + 1)
-    except Exception as e:
-        app.logger.error(f"Error during LibreTranslate translation from {instance}: {str(e)}")
-        
-        # Try another instance
-        return translate_with_libretranslate(text, src_lang, target_lang, retry_count + 1)
-
-def translate_with_google(text, src_lang, target_lang):
-    """Translate text using Google Translate API."""
-    if not text or text.strip() == "":
-        return text
-    
-    try:
-        translate_client = google_translate.Client()
-        result = translate_client.translate(
-            text, 
-            target_language=target_lang,
-            source_language=src_lang
-        )
-        
-        translated_text = result['translatedText']
-        return translated_text
-    except Exception as e:
-        app.logger.error(f"Error during Google translation: {str(e)}")
-        return text
-
-def translate_text(text, src_lang, target_lang, api="libretranslate"):
-    """Translate text using the specified API."""
-    if not text or text.strip() == "":
-        return text
-    
-    # Replace XML entities to prevent translation issues
-    text = text.replace("&lt;", "<LESSTHAN>").replace("&gt;", "<GREATERTHAN>")
-    
-    if api == "google" and GOOGLE_TRANSLATE_AVAILABLE:
-        translated_text = translate_with_google(text, src_lang, target_lang)
-    elif api == "libretranslate":
-        translated_text = translate_with_libretranslate(text, src_lang, target_lang)
-    else:
-        translated_text = translate_with_mymemory(text, src_lang, target_lang)
-    
-    # Restore XML entities
-    translated_text = translated_text.replace("<LESSTHAN>", "&lt;").replace("<GREATERTHAN>", "&gt;")
-    return translated_text
-
 def translate_xml(xml_content, src_lang, target_lang, fields_to_translate, api="libretranslate"):
     """Parse XML content, translate specified fields, and return the translated XML content."""
     result = {
@@ -163,69 +65,79 @@ def translate_xml(xml_content, src_lang, target_lang, fields_to_translate, api="
         'message': '',
         'translated_count': 0,
         'translated_xml': None,
-        'api_used': api  # Track which API was actually used
+        'api_used': api,  # Track which API was actually used
+        'reused_count': 0,  # Elements taken from the translation memory
+        'suggestions': []  # Near matches from the translation memory worth reviewing
     }
     
-    try:
-        # Create a temporary file to write the XML content
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.xml') as temp_file:
-            temp_filename = temp_file.name
-            temp_file.write(xml_content.encode('utf-8'))
+    with translation_memory_lock:
+        memory = get_translation_memory(src_lang, target_lang)
+    
+    def translate_column(original_text):
+        # Reuse exact translations from memory; near matches are only suggested
+        with translation_memory_lock:
+            match = lookup(memory, original_text, DEFAULT_REUSE_THRESHOLD)
+            if match:
+                result['reused_count'] += 1
+                return match[0]
+            similar = find_similar(memory, original_text, DEFAULT_SUGGEST_THRESHOLD, limit=1)
+            if similar and len(result['suggestions']) < MAX_SUGGESTIONS:
+                score, source, target = similar[0]
+                result['suggestions'].append({
+                    'text': original_text,
+                    'source': source,
+                    'target': target,
+                    'score': round(score * 100)
+                })
+        
+        # A failed request keeps the original text, which must not be remembered
+        try:
+            translated_text = translate_text(original_text, src_lang, target_lang, api, raise_errors=True)
+        except TranslationError as e:
+            app.logger.error(str(e))
+            if api != "libretranslate":
+                return original_text
+            
+            # If LibreTranslate failed, try explicitly with MyMemory as fallback and record this
+            try:
+                translated_text = translate_text(original_text, src_lang, target_lang, "mymemory", raise_errors=True)
+            except TranslationError as e:
+                app.logger.error(str(e))
+                return original_text
+            result['api_used'] = "mymemory (fallback)"
         
-        # Parse XML
-        tree = ET.parse(temp_filename)
-        root = tree.getroot()
+        with translation_memory_lock:
+            add_translation(memory, original_text, translated_text)
+        return translated_text
+    
+    try:
+        # Translate elements in batches of 5 with a delay between batches to avoid rate limiting
+        documents = translate_sources(
+            [xml_content.encode('utf-8')],
+            translate_column,
+            fields_to_translate,
+            batch_size=5,
+            batch_delay=0.5
+        )
+        document = next(documents)
         
-        # Count elements that need translation
-        elements_to_translate = []
-        for table in root.findall(".//table"):
-            for column in table.findall("column"):
-                if column.get("name") in fields_to_translate and column.text:
-                    elements_to_translate.append(column)
+        if document['error']:
+            result['success'] = False
+            result['message'] = f"Error processing XML: {document['error']}"
+            return result
         
-        if not elements_to_translate:
+        if not document['columns']:
             result['message'] = 'No text found to translate in the XML file.'
             return result
         
-        result['translated_count'] = len(elements_to_translate)
-        
-        # Translate elements with batch processing to avoid timeouts
-        batch_size = 5  # Process 5 elements at a time
-        for i in range(0, len(elements_to_translate), batch_size):
-            batch = elements_to_translate[i:i+batch_size]
-            
-            # Process each item in the batch
-            for column in batch:
-                if column.text:
-                    original_text = column.text
-                    translated_text = translate_text(original_text, src_lang, target_lang, api)
-                    
-                    # If LibreTranslate failed and fell back to MyMemory, record this
-                    if api == "libretranslate" and translated_text == original_text:
-                        # Try explicitly with MyMemory as fallback
-                        fallback_text = translate_with_mymemory(original_text, src_lang, target_lang)
-                        if fallback_text != original_text:
-                            translated_text = fallback_text
-                            result['api_used'] = "mymemory (fallback)"
-                    
-                    column.text = translated_text
-            
-            # Add a delay between batches to avoid rate limiting
-            if i + batch_size < len(elements_to_translate):
-                time.sleep(0.5)
-        
-        # Write the translated XML to a temporary file
-        tree.write(temp_filename, encoding="utf-8", xml_declaration=True)
-        
-        # Read the translated XML content
-        with open(temp_filename, 'r', encoding='utf-8') as f:
-            translated_xml = f.read()
-        
-        result['translated_xml'] = translated_xml
-        result['message'] = f'Successfully translated {len(elements_to_translate)} elements.'
+        with translation_memory_lock:
+            save_memory(memory)
         
-        # Clean up temporary file
-        os.unlink(temp_filename)
+        result['translated_count'] = len(document['columns'])
+        result['translated_xml'] = document['translated_xml'].decode('utf-8')
+        result['message'] = f"Successfully translated {len(document['columns'])} elements."
+        if result['reused_count']:
+            result['message'] += f" {result['reused_count']} were reused from the translation memory."
         
     except Exception as e:
         result['success'] = False
@@ -295,6 +207,8 @@ def translate():
             session['translation']['translated_path'] = output_translated_path
             session['translation']['message'] = result['message']
             session['translation']['count'] = result['translated_count']
+            session['translation']['reused_count'] = result['reused_count']
+            session['translation']['suggestions'] = result['suggestions']
             
             # Record which API was actually used (in case of fallback)
             if 'api_used' in result:
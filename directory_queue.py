@@ -0,0 +1,190 @@
+"""
+Directory Work Queue
+
+The work queue of work_queue.py kept as plain files in a directory, for coordinators and
+workers on different machines sharing it over NFS or a similar network filesystem. It has
+the same functions as work_queue.py, whose SQLite file depends on file locking that
+network filesystems do not provide reliably.
+
+Every change is an exclusive create (a hard link, which fails if the name exists) or an
+atomic rename over an existing file:
+
+    job.json                 job settings, with 'queued' set once every unit is written
+    units/<id>.json          the strings of one unit
+    leases/<id>.<attempt>    {'worker', 'expires'} for each claim of a unit
+    results/<id>.json        the translations of a finished unit
+
+A worker claims a unit by creating the lease file of its next attempt. Only one worker
+can create it, and the lease with the highest attempt is the current one. Lease expiry is
+compared with each host's clock, so keep the clocks of all machines in sync (e.g. NTP).
+"""
+
+import os
+import json
+import time
+import uuid
+
+from work_queue import DEFAULT_UNIT_SIZE, DEFAULT_LEASE_SECONDS
+
+def open_queue(queue_path):
+    """Open (and create if needed) the queue directory."""
+    for subdir in ("units", "leases", "results"):
+        os.makedirs(os.path.join(queue_path, subdir), exist_ok=True)
+    return queue_path
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_temp(path, value):
+    """Write value to a uniquely named temporary file next to path and return its name."""
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(value, f)
+    return temp_path
+
+def _replace_json(path, value):
+    """Write path atomically, replacing any existing file."""
+    os.replace(_write_temp(path, value), path)
+
+def _create_json(path, value):
+    """Write path atomically; raises FileExistsError if it already exists."""
+    temp_path = _write_temp(path, value)
+    try:
+        os.link(temp_path, path)
+    finally:
+        os.remove(temp_path)
+
+def _unit_ids(connection):
+    return sorted(int(name[:-5]) for name in os.listdir(os.path.join(connection, "units")) if name.endswith(".json"))
+
+def _done_ids(connection):
+    return set(int(name[:-5]) for name in os.listdir(os.path.join(connection, "results")) if name.endswith(".json"))
+
+def _lease_attempts(connection):
+    """Return {unit id: highest attempt} for every unit that was ever claimed."""
+    attempts = {}
+    for name in os.listdir(os.path.join(connection, "leases")):
+        unit_id, _, attempt = name.partition(".")
+        if unit_id.isdigit() and attempt.isdigit():
+            attempts[int(unit_id)] = max(attempts.get(int(unit_id), 0), int(attempt))
+    return attempts
+
+def _lease_path(connection, unit_id, attempt):
+    return os.path.join(connection, "leases", f"{unit_id}.{attempt}")
+
+def _current_lease(connection, unit_id):
+    """Return (lease path, lease) of the latest claim on a unit, or (None, None)."""
+    attempt = _lease_attempts(connection).get(unit_id)
+    if attempt is None:
+        return None, None
+    path = _lease_path(connection, unit_id, attempt)
+    return path, _read_json(path)
+
+def set_job(connection, settings):
+    """Store the job settings (languages, API, ...) that workers should use."""
+    job = get_job(connection)
+    job.update(settings)
+    _replace_json(os.path.join(connection, "job.json"), job)
+
+def get_job(connection):
+    """Return the job settings stored by the coordinator."""
+    path = os.path.join(connection, "job.json")
+    return _read_json(path) if os.path.exists(path) else {}
+
+def enqueue_strings(connection, strings, unit_size=DEFAULT_UNIT_SIZE):
+    """
+    Split strings into work units of at most unit_size and add them to the queue.
+
+    The 'queued' job setting is set after the last unit is written; workers do not claim
+    anything before that, so units left over from an interrupted enqueue are cleared first.
+    """
+    strings = list(strings)
+    for subdir in ("units", "leases", "results"):
+        for name in os.listdir(os.path.join(connection, subdir)):
+            os.remove(os.path.join(connection, subdir, name))
+
+    units = 0
+    for i in range(0, len(strings), unit_size):
+        units += 1
+        _replace_json(os.path.join(connection, "units", f"{units}.json"), strings[i:i + unit_size])
+    set_job(connection, {'queued': True})
+    return units
+
+def is_queued(connection):
+    """Return True once the coordinator has queued all of its work units."""
+    return bool(get_job(connection).get('queued'))
+
+def claim_unit(connection, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Lease the next pending unit, or a unit whose lease has expired, to worker.
+
+    Returns (unit id, [strings]) or None if no unit is available right now.
+    """
+    if not is_queued(connection):
+        return None
+    now = time.time()
+    done = _done_ids(connection)
+    attempts = _lease_attempts(connection)
+    for unit_id in _unit_ids(connection):
+        if unit_id in done:
+            continue
+        attempt = attempts.get(unit_id, 0)
+        if attempt and _read_json(_lease_path(connection, unit_id, attempt))['expires'] >= now:
+            continue
+        try:
+            _create_json(_lease_path(connection, unit_id, attempt + 1), {'worker': worker, 'expires': now + lease_seconds})
+        except FileExistsError:
+            continue  # Another worker claimed it first
+        return unit_id, _read_json(os.path.join(connection, "units", f"{unit_id}.json"))
+    return None
+
+def renew_lease(connection, unit_id, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Extend a lease; returns False if the unit was reclaimed by another worker."""
+    path, lease = _current_lease(connection, unit_id)
+    if lease is None or lease['worker'] != worker:
+        return False
+    _replace_json(path, {'worker': worker, 'expires': time.time() + lease_seconds})
+    return True
+
+def complete_unit(connection, unit_id, worker, translations):
+    """Store the translations for a leased unit; returns False if the lease was lost."""
+    _, lease = _current_lease(connection, unit_id)
+    if lease is None or lease['worker'] != worker:
+        return False
+    _replace_json(os.path.join(connection, "results", f"{unit_id}.json"), translations)
+    return True
+
+def release_unit(connection, unit_id, worker):
+    """Give up a leased unit so any worker can claim it again; returns False if the lease was lost."""
+    path, lease = _current_lease(connection, unit_id)
+    if lease is None or lease['worker'] != worker:
+        return False
+    _replace_json(path, {'worker': worker, 'expires': 0})
+    return True
+
+def queue_progress(connection):
+    """Return {'pending': n, 'leased': n, 'expired': n, 'done': n} for the queue."""
+    progress = {'pending': 0, 'leased': 0, 'expired': 0, 'done': 0}
+    now = time.time()
+    done = _done_ids(connection)
+    attempts = _lease_attempts(connection)
+    for unit_id in _unit_ids(connection):
+        if unit_id in done:
+            status = 'done'
+        elif unit_id not in attempts:
+            status = 'pending'
+        elif _read_json(_lease_path(connection, unit_id, attempts[unit_id]))['expires'] < now:
+            status = 'expired'
+        else:
+            status = 'leased'
+        progress[status] += 1
+    return progress
+
+def collect_translations(connection):
+    """Return {source: translation} from every finished unit."""
+    translations = {}
+    for unit_id in sorted(_done_ids(connection)):
+        strings = _read_json(os.path.join(connection, "units", f"{unit_id}.json"))
+        translations.update(zip(strings, _read_json(os.path.join(connection, "results", f"{unit_id}.json"))))
+    return translations
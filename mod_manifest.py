@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Mod Manifest Tool
+
+This script scans the img/ folders of every mod, checks them against the
+hand-maintained getimages.php manifests and the getmods.php mod list, and can
+regenerate those manifests from what is actually on disk.
+"""
+
+import os
+import re
+import sys
+import json
+import struct
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+# Default configuration
+DEFAULT_MODS_PATH = "Mods"
+DEFAULT_MODS_LIST = "getmods.php"
+DEFAULT_CACHE_FILE = ".manifest_cache.json"
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+IMAGE_DIR = "img"
+IMAGE_MANIFEST = "getimages.php"
+HIRES_PREFIX = "x2_"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+IMAGE_ENTRY_RE = re.compile(r"strImageURL(\d+)=([^&\n]*)")
+MOD_ENTRY_RE = re.compile(r"strModName(\d+)=([^&\n]*)&strModURL\1=([^&\n]*)")
+NROWS_RE = re.compile(r"nRows=(\d+)")
+
+def find_mod_dirs(root_dir):
+    """Find all mod directories (folders with an img/ subfolder) under root_dir."""
+    mod_dirs = []
+    for dirpath, dirnames, _ in os.walk(root_dir):
+        if IMAGE_DIR in dirnames:
+            mod_dirs.append(dirpath)
+            # A mod's own img/ folder never contains further mods
+            dirnames.remove(IMAGE_DIR)
+    return sorted(mod_dirs)
+
+def load_cache(cache_path):
+    """Load the file stat/hash cache, returning an empty cache if it is missing or unreadable."""
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable cache {cache_path}: {str(e)}")
+        return {}
+
+def save_cache(cache_path, cache):
+    """Write the file stat/hash cache atomically."""
+    temp_path = f"{cache_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(temp_path, cache_path)
+
+def read_png_size(data):
+    """Return (width, height) from the IHDR chunk of PNG data, or None if the header is invalid."""
+    if len(data) < 24 or not data.startswith(PNG_SIGNATURE) or data[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", data[16:24])
+
+def inspect_image(file_path):
+    """Hash an image file and read its PNG header."""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    size = read_png_size(data)
+    return {
+        'sha1': hashlib.sha1(data).hexdigest(),
+        'png': size is not None,
+        'width': size[0] if size else 0,
+        'height': size[1] if size else 0
+    }
+
+def scan_images(mod_dirs, root_dir, cache, workers=DEFAULT_WORKERS):
+    """
+    Stat every image in the given mods' img/ folders and hash the ones that changed.
+
+    Returns ({mod_dir: {filename: info}}, new_cache, rehashed_count). Files whose size
+    and mtime match the cache are not reopened.
+    """
+    images = {mod_dir: {} for mod_dir in mod_dirs}
+    new_cache = {}
+    pending = []
+
+    for mod_dir in mod_dirs:
+        with os.scandir(os.path.join(mod_dir, IMAGE_DIR)) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                key = os.path.relpath(entry.path, root_dir).replace(os.sep, "/")
+                cached = cache.get(key)
+                if cached and cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+                    info = cached
+                else:
+                    info = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+                    pending.append((info, entry.path))
+                images[mod_dir][entry.name] = info
+                new_cache[key] = info
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for (info, _), result in zip(pending, executor.map(inspect_image, [path for _, path in pending])):
+                info.update(result)
+
+    return images, new_cache, len(pending)
+
+def parse_image_manifest(text):
+    """Parse a getimages.php manifest into (nRows, [image names])."""
+    match = NROWS_RE.search(text)
+    nrows = int(match.group(1)) if match else None
+    entries = sorted((int(index), name) for index, name in IMAGE_ENTRY_RE.findall(text))
+    return nrows, [name for _, name in entries]
+
+def render_image_manifest(names):
+    """Render a list of image names in the getimages.php format."""
+    header = f"nRows={len(names)}&nCols=2"
+    if not names:
+        return header
+    return header + "&" + "\n&".join(f"strImageURL{i}={name}" for i, name in enumerate(names))
+
+def parse_mods_list(text):
+    """Parse a getmods.php mod list into (nRows, [(mod name, mod URL)])."""
+    match = NROWS_RE.search(text)
+    nrows = int(match.group(1)) if match else None
+    entries = sorted((int(index), name, url) for index, name, url in MOD_ENTRY_RE.findall(text))
+    return nrows, [(name, url) for _, name, url in entries]
+
+def render_mods_list(mods):
+    """Render a list of (mod name, mod URL) pairs in the getmods.php format."""
+    rows = [f"&strModName{i}={name}&strModURL{i}={url}" for i, (name, url) in enumerate(mods)]
+    return "\n".join([f"nRows={len(mods)}"] + rows)
+
+def pair_order(names):
+    """Order image names so that each x2_ image directly follows its 1x image."""
+    names = set(names)
+    ordered = []
+    for name in sorted(names):
+        if name.startswith(HIRES_PREFIX) and name[len(HIRES_PREFIX):] in names:
+            continue
+        ordered.append(name)
+        if HIRES_PREFIX + name in names:
+            ordered.append(HIRES_PREFIX + name)
+    return ordered
+
+def build_image_list(listed, images):
+    """
+    Build the regenerated manifest for a mod.
+
+    Entries that still exist keep their hand-maintained order; duplicates and
+    entries whose file is gone are dropped, and unlisted PNGs are appended in pairs.
+    """
+    kept = []
+    seen = set()
+    for name in listed:
+        if name in images and name not in seen:
+            kept.append(name)
+            seen.add(name)
+    new_names = [name for name in images if name not in seen and name.lower().endswith('.png')]
+    return kept + pair_order(new_names)
+
+def audit_mod(mod_dir, nrows, listed, images):
+    """Compare a mod's manifest with its img/ folder and return a list of issue strings."""
+    issues = []
+    listed_set = set(listed)
+
+    if nrows is None:
+        issues.append(f"{IMAGE_MANIFEST} is missing or has no nRows")
+    elif nrows != len(listed):
+        issues.append(f"nRows={nrows} but {len(listed)} entries are listed")
+
+    seen = set()
+    for name in listed:
+        if name in seen:
+            issues.append(f"duplicate entry: {name}")
+        seen.add(name)
+        if name not in images:
+            issues.append(f"missing file: {name}")
+
+    for name in sorted(images):
+        info = images[name]
+        if name not in listed_set:
+            issues.append(f"orphaned file: {name}")
+        if name.lower().endswith('.png') and not info['png']:
+            issues.append(f"invalid PNG header: {name}")
+
+        if not name.startswith(HIRES_PREFIX):
+            continue
+        base = images.get(name[len(HIRES_PREFIX):])
+        if base is None:
+            issues.append(f"{HIRES_PREFIX} image without 1x image: {name}")
+        elif info['png'] and base['png'] and (info['width'], info['height']) != (base['width'] * 2, base['height'] * 2):
+            issues.append(
+                f"{HIRES_PREFIX} image is {info['width']}x{info['height']}, "
+                f"expected {base['width'] * 2}x{base['height'] * 2}: {name}"
+            )
+
+    return issues
+
+def audit_mods_list(mods_list_path, nrows, mods, mod_dirs):
+    """Compare getmods.php with the mod directories on disk and return a list of issue strings."""
+    issues = []
+    base_dir = os.path.dirname(os.path.abspath(mods_list_path))
+    listed_dirs = set()
+
+    if nrows is None:
+        issues.append("getmods.php has no nRows")
+    elif nrows != len(mods):
+        issues.append(f"nRows={nrows} but {len(mods)} mods are listed")
+
+    for name, url in mods:
+        mod_path = os.path.normpath(os.path.join(base_dir, url))
+        listed_dirs.add(mod_path)
+        if not os.path.isfile(os.path.join(mod_path, IMAGE_MANIFEST)):
+            issues.append(f"listed mod {name} has no {IMAGE_MANIFEST}: {url}")
+
+    for mod_dir in mod_dirs:
+        if os.path.normpath(os.path.abspath(mod_dir)) not in listed_dirs:
+            issues.append(f"mod not listed: {mod_dir}")
+
+    return issues
+
+def build_mods_list(mods_list_path, mods, mod_dirs):
+    """Keep listed mods that still exist and append unlisted mod directories by folder name."""
+    base_dir = os.path.dirname(os.path.abspath(mods_list_path))
+    kept = []
+    listed_dirs = set()
+    for name, url in mods:
+        mod_path = os.path.normpath(os.path.join(base_dir, url))
+        if os.path.isdir(mod_path):
+            kept.append((name, url))
+            listed_dirs.add(mod_path)
+    for mod_dir in mod_dirs:
+        mod_path = os.path.normpath(os.path.abspath(mod_dir))
+        if mod_path not in listed_dirs:
+            url = os.path.relpath(mod_path, base_dir).replace(os.sep, "/")
+            kept.append((os.path.basename(mod_path), url))
+    return kept
+
+def read_text(path):
+    """Read a manifest file, returning an empty string if it does not exist."""
+    if not os.path.exists(path):
+        return ""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read()
+
+def write_text(path, text):
+    """Write a manifest file without newline translation."""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and regenerate getimages.php / getmods.php manifests")
+    parser.add_argument("--path", default=DEFAULT_MODS_PATH, help="Path to directory containing mods")
+    parser.add_argument("--mods-list", default=DEFAULT_MODS_LIST, help="Path to getmods.php")
+    parser.add_argument("--cache", help=f"Path to the stat/hash cache (default: <path>/{DEFAULT_CACHE_FILE})")
+    parser.add_argument("--no-cache", action="store_true", help="Rehash every image and do not write a cache")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of parallel hashing threads")
+    parser.add_argument("--write", action="store_true", help="Regenerate getimages.php files from the img/ folders")
+    parser.add_argument("--write-mods-list", action="store_true", help="Regenerate getmods.php from the mod directories")
+
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.path):
+        print(f"Error: {args.path} is not a directory")
+        sys.exit(1)
+
+    cache_path = None if args.no_cache else (args.cache or os.path.join(args.path, DEFAULT_CACHE_FILE))
+    cache = load_cache(cache_path)
+
+    mod_dirs = find_mod_dirs(args.path)
+    print(f"Found {len(mod_dirs)} mods")
+
+    images, new_cache, rehashed = scan_images(mod_dirs, args.path, cache, args.workers)
+    print(f"Scanned {sum(len(files) for files in images.values())} images ({rehashed} new or changed)")
+
+    if cache_path:
+        save_cache(cache_path, new_cache)
+
+    issue_count = 0
+    for mod_dir in mod_dirs:
+        manifest_path = os.path.join(mod_dir, IMAGE_MANIFEST)
+        text = read_text(manifest_path)
+        nrows, listed = parse_image_manifest(text)
+        issues = audit_mod(mod_dir, nrows if text else None, listed, images[mod_dir])
+
+        if issues:
+            print(f"{manifest_path}: {len(issues)} issue(s)")
+            for issue in issues:
+                print(f"  {issue}")
+            issue_count += len(issues)
+
+        if args.write:
+            rendered = render_image_manifest(build_image_list(listed, images[mod_dir]))
+            if rendered != text:
+                write_text(manifest_path, rendered)
+                print(f"Updated {manifest_path}")
+
+    if os.path.exists(args.mods_list) or args.write_mods_list:
+        text = read_text(args.mods_list)
+        nrows, mods = parse_mods_list(text)
+        issues = audit_mods_list(args.mods_list, nrows if text else None, mods, mod_dirs)
+
+        if issues:
+            print(f"{args.mods_list}: {len(issues)} issue(s)")
+            for issue in issues:
+                print(f"  {issue}")
+            issue_count += len(issues)
+
+        if args.write_mods_list:
+            rendered = render_mods_list(build_mods_list(args.mods_list, mods, mod_dirs))
+            if rendered != text:
+                write_text(args.mods_list, rendered)
+                print(f"Updated {args.mods_list}")
+
+    print("-" * 50)
+    print(f"Found {issue_count} issue(s)")
+
+    # Only fail a check run; a write run has already fixed what it can
+    if issue_count and not (args.write or args.write_mods_list):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
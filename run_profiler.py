@@ -0,0 +1,166 @@
+"""
+Run Profiler
+
+Records per-phase and per-file timings of a translation run, prints a summary table
+and writes a Chrome trace event file that chrome://tracing, Perfetto and speedscope
+can open as a timeline / flamegraph.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Default configuration
+DEFAULT_TRACE_PATH = "xml_translator_profile.json"
+SLOWEST_FILES_SHOWN = 10
+
+# Profile of the current run, or None when profiling is off
+ACTIVE_PROFILE = None
+
+def start_profile():
+    """Start recording a new profile and make it the active one."""
+    global ACTIVE_PROFILE
+    ACTIVE_PROFILE = {
+        'start': time.perf_counter(),
+        'end': None,
+        'events': [],
+        'phases': {},  # phase name -> [total seconds, calls]
+        'files': {},  # file path -> seconds
+        'latencies': [],  # translation request latencies in seconds
+        'strings': 0,
+        'chars': 0,
+        'failed_requests': 0
+    }
+    return ACTIVE_PROFILE
+
+def stop_profile():
+    """Stop recording and return the finished profile."""
+    global ACTIVE_PROFILE
+    profile = ACTIVE_PROFILE
+    ACTIVE_PROFILE = None
+    if profile:
+        profile['end'] = time.perf_counter()
+    return profile
+
+def _record_event(profile, category, name, start, duration, args):
+    """Append a complete ("X") trace event in microseconds since the run started."""
+    profile['events'].append({
+        'name': name,
+        'cat': category,
+        'ph': 'X',
+        'ts': round((start - profile['start']) * 1e6, 3),
+        'dur': round(duration * 1e6, 3),
+        'pid': os.getpid(),
+        'tid': threading.get_ident(),
+        'args': args
+    })
+
+@contextmanager
+def phase(name, **args):
+    """Time a block as one phase of the run (walk, parse, request, sleep, write, ...)."""
+    profile = ACTIVE_PROFILE
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        totals = profile['phases'].setdefault(name, [0.0, 0])
+        totals[0] += duration
+        totals[1] += 1
+        _record_event(profile, 'phase', name, start, duration, args)
+
+def phase_iter(name, iterable):
+    """Yield the items of iterable, timing each step of it as the phase name (e.g. a lazy directory walk)."""
+    iterator = iter(iterable)
+    while True:
+        with phase(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+@contextmanager
+def file_span(file_path):
+    """Time all work done on one file."""
+    profile = ACTIVE_PROFILE
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_file(file_path, start)
+
+def record_file(file_path, start):
+    """Record the work done on one file since start, a time.perf_counter() value."""
+    profile = ACTIVE_PROFILE
+    if profile is None:
+        return
+    duration = time.perf_counter() - start
+    profile['files'][file_path] = profile['files'].get(file_path, 0.0) + duration
+    _record_event(profile, 'file', os.path.basename(file_path), start, duration, {'path': file_path})
+
+def record_request(latency, text, failed=False):
+    """Record one translation request and the size of the text it translated."""
+    profile = ACTIVE_PROFILE
+    if profile is None:
+        return
+    profile['latencies'].append(latency)
+    profile['strings'] += 1
+    profile['chars'] += len(text)
+    if failed:
+        profile['failed_requests'] += 1
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+def print_profile_summary(profile):
+    """Print the per-phase table, throughput, request latency and slowest files."""
+    total = (profile['end'] or time.perf_counter()) - profile['start']
+    phase_total = sum(seconds for seconds, _ in profile['phases'].values())
+
+    print("=" * 50)
+    print("Profile summary")
+    print(f"{'Phase':<12}{'Total (s)':>12}{'Calls':>10}{'% of run':>12}")
+    for name, (seconds, calls) in sorted(profile['phases'].items(), key=lambda item: -item[1][0]):
+        print(f"{name:<12}{seconds:>12.3f}{calls:>10}{seconds / total * 100 if total else 0:>11.1f}%")
+    other = max(0.0, total - phase_total)
+    print(f"{'other':<12}{other:>12.3f}{'':>10}{other / total * 100 if total else 0:>11.1f}%")
+    print(f"{'total':<12}{total:>12.3f}")
+
+    print("-" * 50)
+    print(f"Translated {profile['strings']} strings, {profile['chars']} chars via the API")
+    if total:
+        print(f"Throughput: {profile['strings'] / total:.2f} strings/sec, {profile['chars'] / total:.1f} chars/sec")
+    latencies = profile['latencies']
+    print(
+        f"Request latency: p50 {percentile(latencies, 50) * 1000:.0f} ms, "
+        f"p95 {percentile(latencies, 95) * 1000:.0f} ms, "
+        f"p99 {percentile(latencies, 99) * 1000:.0f} ms"
+    )
+    print(f"Failed requests: {profile['failed_requests']}")
+    print(f"Time spent sleeping: {profile['phases'].get('sleep', [0.0])[0]:.3f} s")
+
+    if profile['files']:
+        print("-" * 50)
+        print("Slowest files:")
+        slowest = sorted(profile['files'].items(), key=lambda item: -item[1])[:SLOWEST_FILES_SHOWN]
+        for file_path, seconds in slowest:
+            print(f"{seconds:>10.3f} s  {file_path}")
+
+def write_trace(profile, trace_path):
+    """Write the profile as a Chrome trace event JSON file."""
+    with open(trace_path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': profile['events'], 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Sprite Atlas Packer for Mods
+
+This script packs the images listed in each mod's getimages.php into a few texture
+atlases, keeping the 1x and x2_ images in separate atlases, and writes a getatlas.php
+offset index next to the manifest. Only atlases whose input images changed are redrawn.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from mod_manifest import (
+    DEFAULT_MODS_PATH, DEFAULT_CACHE_FILE, DEFAULT_WORKERS, IMAGE_DIR, IMAGE_MANIFEST,
+    HIRES_PREFIX, find_mod_dirs, load_cache, save_cache, scan_images, parse_image_manifest,
+    read_text, write_text
+)
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Default configuration
+DEFAULT_MAX_SIZE = 2048  # Maximum 1x atlas side; x2_ atlases use twice this
+DEFAULT_PADDING = 1  # Transparent pixels between sprites to avoid bleeding
+DEFAULT_ATLAS_DIR = "atlas"
+ATLAS_INDEX = "getatlas.php"
+ATLAS_STATE = "atlas_state.json"
+
+def find_position(free_rects, width, height):
+    """Find the free rectangle position that fits width x height with the best short side fit."""
+    best = None
+    best_score = None
+    for fx, fy, fw, fh in free_rects:
+        if width > fw or height > fh:
+            continue
+        leftover_w, leftover_h = fw - width, fh - height
+        score = (min(leftover_w, leftover_h), max(leftover_w, leftover_h))
+        if best_score is None or score < best_score:
+            best, best_score = (fx, fy), score
+    return best
+
+def split_free_rects(free_rects, used):
+    """Remove the used rectangle from the free list (MaxRects split and prune)."""
+    ux, uy, uw, uh = used
+    result = []
+    for fx, fy, fw, fh in free_rects:
+        if ux >= fx + fw or ux + uw <= fx or uy >= fy + fh or uy + uh <= fy:
+            result.append((fx, fy, fw, fh))
+            continue
+        if ux > fx:
+            result.append((fx, fy, ux - fx, fh))
+        if ux + uw < fx + fw:
+            result.append((ux + uw, fy, fx + fw - ux - uw, fh))
+        if uy > fy:
+            result.append((fx, fy, fw, uy - fy))
+        if uy + uh < fy + fh:
+            result.append((fx, uy + uh, fw, fy + fh - uy - uh))
+
+    # Drop free rectangles fully contained in another one
+    pruned = []
+    for i, (ax, ay, aw, ah) in enumerate(result):
+        contained = False
+        for j, (bx, by, bw, bh) in enumerate(result):
+            if i != j and bx <= ax and by <= ay and ax + aw <= bx + bw and ay + ah <= by + bh:
+                # Keep the first of two identical rectangles
+                if (ax, ay, aw, ah) != (bx, by, bw, bh) or j < i:
+                    contained = True
+                    break
+        if not contained:
+            pruned.append((ax, ay, aw, ah))
+    return pruned
+
+def pack_images(sizes, max_size, padding=DEFAULT_PADDING):
+    """
+    Pack {name: (width, height)} into as few max_size x max_size bins as possible.
+
+    Uses the MaxRects algorithm with best short side fit, placing the largest images
+    first. Returns a list of bins, each a list of (name, x, y, width, height).
+    Images that do not fit in an empty bin are left out of the result.
+    """
+    order = sorted(sizes, key=lambda name: (-max(sizes[name]), -min(sizes[name]), name))
+    bins = []
+    for name in order:
+        width, height = sizes[name]
+        padded_w, padded_h = width + padding, height + padding
+        if padded_w > max_size + padding or padded_h > max_size + padding:
+            continue
+        for free_rects, placed in bins:
+            position = find_position(free_rects, padded_w, padded_h)
+            if position:
+                break
+        else:
+            free_rects, placed = [(0, 0, max_size + padding, max_size + padding)], []
+            bins.append((free_rects, placed))
+            position = (0, 0)
+
+        x, y = position
+        placed.append((name, x, y, width, height))
+        free_rects[:] = split_free_rects(free_rects, (x, y, padded_w, padded_h))
+    return [placed for _, placed in bins]
+
+def atlas_signature(placed, images):
+    """Hash an atlas layout together with the content of every image in it."""
+    digest = hashlib.sha1()
+    for name, x, y, width, height in sorted(placed):
+        digest.update(f"{name}:{x}:{y}:{width}:{height}:{images[name]['sha1']}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+def render_atlas(img_dir, placed, atlas_path):
+    """Draw the placed images onto a transparent RGBA atlas and save it as PNG."""
+    width = max(x + w for _, x, _, w, _ in placed)
+    height = max(y + h for _, _, y, _, h in placed)
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    for name, x, y, _, _ in placed:
+        with Image.open(os.path.join(img_dir, name)) as sprite:
+            atlas.paste(sprite.convert("RGBA"), (x, y))
+    atlas.save(atlas_path, "PNG")
+
+def render_atlas_index(entries):
+    """Render (image name, atlas URL, x, y, width, height) entries in the getimages.php style."""
+    header = f"nRows={len(entries)}&nCols=6"
+    if not entries:
+        return header
+    rows = [
+        f"strImageURL{i}={name}&strAtlasURL{i}={url}&nX{i}={x}&nY{i}={y}&nW{i}={w}&nH{i}={h}"
+        for i, (name, url, x, y, w, h) in enumerate(entries)
+    ]
+    return header + "&" + "\n&".join(rows)
+
+def build_mod_atlases(mod_dir, images, max_size, padding, atlas_dir_name, force, executor):
+    """Pack one mod's listed images, redraw changed atlases and write the offset index."""
+    img_dir = os.path.join(mod_dir, IMAGE_DIR)
+    atlas_dir = os.path.join(mod_dir, atlas_dir_name)
+    state_path = os.path.join(atlas_dir, ATLAS_STATE)
+
+    _, listed = parse_image_manifest(read_text(os.path.join(mod_dir, IMAGE_MANIFEST)))
+    listed = list(dict.fromkeys(name for name in listed if name in images))
+    skipped = [name for name in listed if not images[name]['png']]
+
+    # 1x and x2_ images go into separate atlas sets
+    sets = [("atlas", max_size, {}), (HIRES_PREFIX + "atlas", max_size * 2, {})]
+    for name in listed:
+        if images[name]['png']:
+            target = sets[1][2] if name.startswith(HIRES_PREFIX) else sets[0][2]
+            target[name] = (images[name]['width'], images[name]['height'])
+
+    old_state = {}
+    if os.path.exists(state_path):
+        with open(state_path, 'r', encoding='utf-8') as f:
+            old_state = json.load(f)
+
+    os.makedirs(atlas_dir, exist_ok=True)
+    new_state = {}
+    placements = {}
+    jobs = []
+    for prefix, set_max_size, sizes in sets:
+        bins = pack_images(sizes, set_max_size, padding)
+        packed = set()
+        for index, placed in enumerate(bins):
+            atlas_name = f"{prefix}{index}.png"
+            atlas_path = os.path.join(atlas_dir, atlas_name)
+            signature = atlas_signature(placed, images)
+            new_state[atlas_name] = signature
+            if force or old_state.get(atlas_name) != signature or not os.path.exists(atlas_path):
+                jobs.append(executor.submit(render_atlas, img_dir, placed, atlas_path))
+            for name, x, y, width, height in placed:
+                placements[name] = (f"{atlas_dir_name}/{atlas_name}", x, y, width, height)
+                packed.add(name)
+        skipped.extend(sorted(set(sizes) - packed))
+
+    for job in jobs:
+        job.result()
+
+    # Remove atlases left over from a previous, larger layout
+    for atlas_name in old_state:
+        if atlas_name not in new_state and os.path.exists(os.path.join(atlas_dir, atlas_name)):
+            os.remove(os.path.join(atlas_dir, atlas_name))
+
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(new_state, f, indent=1, sort_keys=True)
+
+    entries = [(name,) + placements[name] for name in listed if name in placements]
+    index_path = os.path.join(mod_dir, ATLAS_INDEX)
+    rendered = render_atlas_index(entries)
+    if read_text(index_path) != rendered:
+        write_text(index_path, rendered)
+
+    return len(new_state), len(jobs), skipped
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack mod images into texture atlases")
+    parser.add_argument("--path", default=DEFAULT_MODS_PATH, help="Path to directory containing mods")
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE, help="Maximum 1x atlas width/height in pixels")
+    parser.add_argument("--padding", type=int, default=DEFAULT_PADDING, help="Transparent pixels between sprites")
+    parser.add_argument("--atlas-dir", default=DEFAULT_ATLAS_DIR, help="Name of the atlas folder inside each mod")
+    parser.add_argument("--cache", help=f"Path to the stat/hash cache (default: <path>/{DEFAULT_CACHE_FILE})")
+    parser.add_argument("--no-cache", action="store_true", help="Rehash every image and do not write a cache")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Number of parallel threads")
+    parser.add_argument("--force", action="store_true", help="Redraw every atlas even if its inputs did not change")
+
+    args = parser.parse_args()
+
+    if not PIL_AVAILABLE:
+        print("Error: atlas packing requires the 'Pillow' package.")
+        print("Install it with: pip install Pillow")
+        sys.exit(1)
+
+    if not os.path.isdir(args.path):
+        print(f"Error: {args.path} is not a directory")
+        sys.exit(1)
+
+    cache_path = None if args.no_cache else (args.cache or os.path.join(args.path, DEFAULT_CACHE_FILE))
+    mod_dirs = find_mod_dirs(args.path)
+    print(f"Found {len(mod_dirs)} mods")
+
+    images, new_cache, _ = scan_images(mod_dirs, args.path, load_cache(cache_path), args.workers)
+    if cache_path:
+        save_cache(cache_path, new_cache)
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for mod_dir in mod_dirs:
+            atlas_count, redrawn, skipped = build_mod_atlases(
+                mod_dir,
+                images[mod_dir],
+                args.max_size,
+                args.padding,
+                args.atlas_dir,
+                args.force,
+                executor
+            )
+            print(f"{mod_dir}: {atlas_count} atlases ({redrawn} redrawn)")
+            for name in skipped:
+                print(f"  not packed (invalid PNG or larger than the atlas): {name}")
+
+if __name__ == "__main__":
+    main()
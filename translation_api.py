@@ -0,0 +1,153 @@
+"""
+Translation APIs
+
+Clients for the MyMemory, LibreTranslate and Google Translate APIs, shared by the web
+application and the command-line scripts.
+"""
+
+import logging
+import requests
+
+try:
+    from google.cloud import translate_v2 as google_translate
+    GOOGLE_TRANSLATE_AVAILABLE = True
+except ImportError:
+    GOOGLE_TRANSLATE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Default configuration
+DEFAULT_MYMEMORY_API_URL = "https://api.mymemory.translated.net/get"
+REQUEST_TIMEOUT = 10  # 10 seconds timeout for API requests
+MAX_RETRIES = 2      # Maximum retries for failed LibreTranslate requests
+
+# Multiple LibreTranslate instances to try
+LIBRETRANSLATE_INSTANCES = [
+    "https://libretranslate.de",
+    "https://translate.argosopentech.com",
+    "https://translate.terraprint.co",
+    "https://lt.vern.cc"
+]
+
+class TranslationError(Exception):
+    """Raised when a translation API request fails."""
+
+def request_mymemory(text, src_lang, target_lang, api_url=DEFAULT_MYMEMORY_API_URL):
+    """Translate text using MyMemory Translation API, raising TranslationError on failure."""
+    params = {
+        'q': text,
+        'langpair': f'{src_lang}|{target_lang}'
+    }
+
+    try:
+        response = requests.get(api_url, params=params, timeout=REQUEST_TIMEOUT)
+        response_json = response.json()
+    except Exception as e:
+        raise TranslationError(f"Error during translation: {str(e)}")
+
+    if response.status_code == 200 and response_json['responseStatus'] == 200:
+        return response_json['responseData']['translatedText']
+    raise TranslationError(f"Translation error: {response_json.get('responseDetails', 'Unknown error')}")
+
+def request_libretranslate(text, src_lang, target_lang, retry_count=0):
+    """
+    Translate text using LibreTranslate API, trying another instance on each retry.
+
+    Falls back to MyMemory after MAX_RETRIES; raises TranslationError if that fails too.
+    """
+    # If we've reached max retries, fall back to MyMemory
+    if retry_count > MAX_RETRIES:
+        logger.warning("LibreTranslate failed after maximum retries, falling back to MyMemory")
+        return request_mymemory(text, src_lang, target_lang)
+
+    # Select a different instance on each retry
+    instance = LIBRETRANSLATE_INSTANCES[retry_count % len(LIBRETRANSLATE_INSTANCES)]
+    api_url = f"{instance}/translate"
+
+    payload = {
+        "q": text,
+        "source": src_lang,
+        "target": target_lang,
+        "format": "text"
+    }
+
+    try:
+        response = requests.post(api_url, json=payload, timeout=REQUEST_TIMEOUT)
+        response_json = response.json()
+
+        if response.status_code == 200 and "translatedText" in response_json:
+            return response_json["translatedText"]
+        logger.error(f"LibreTranslate error from {instance}: {response_json.get('error', 'Unknown error')}")
+    except Exception as e:
+        logger.error(f"Error during LibreTranslate translation from {instance}: {str(e)}")
+
+    # Try another instance
+    return request_libretranslate(text, src_lang, target_lang, retry_count + 1)
+
+def request_google(text, src_lang, target_lang):
+    """Translate text using Google Translate API, raising TranslationError on failure."""
+    try:
+        translate_client = google_translate.Client()
+        result = translate_client.translate(
+            text,
+            target_language=target_lang,
+            source_language=src_lang
+        )
+        return result['translatedText']
+    except Exception as e:
+        raise TranslationError(f"Error during Google translation: {str(e)}")
+
+def _return_original_on_error(request, text, src_lang, target_lang):
+    """Call a request_* function, logging failures and returning the original text instead."""
+    if not text or text.strip() == "":
+        return text
+    try:
+        return request(text, src_lang, target_lang)
+    except TranslationError as e:
+        logger.error(str(e))
+        return text
+
+def translate_with_mymemory(text, src_lang, target_lang):
+    """Translate text using MyMemory Translation API."""
+    return _return_original_on_error(request_mymemory, text, src_lang, target_lang)
+
+def translate_with_libretranslate(text, src_lang, target_lang):
+    """Translate text using LibreTranslate API with retries and fallbacks."""
+    return _return_original_on_error(request_libretranslate, text, src_lang, target_lang)
+
+def translate_with_google(text, src_lang, target_lang):
+    """Translate text using Google Translate API."""
+    return _return_original_on_error(request_google, text, src_lang, target_lang)
+
+def translate_text(text, src_lang, target_lang, api="mymemory", raise_errors=False):
+    """
+    Translate text using the specified API (mymemory, libretranslate or google).
+
+    On failure the error is logged and the original text is returned, or TranslationError
+    is raised if raise_errors is set, so callers can tell a failed request from a string
+    whose translation happens to be identical.
+    """
+    if not text or text.strip() == "":
+        return text
+
+    # Replace XML entities to prevent translation issues
+    text = text.replace("&lt;", "<LESSTHAN>").replace("&gt;", "<GREATERTHAN>")
+
+    if api == "google" and GOOGLE_TRANSLATE_AVAILABLE:
+        request = request_google
+    elif api == "libretranslate":
+        request = request_libretranslate
+    else:
+        request = request_mymemory
+
+    try:
+        translated_text = request(text, src_lang, target_lang)
+    except TranslationError as e:
+        if raise_errors:
+            raise
+        logger.error(str(e))
+        translated_text = text
+
+    # Restore XML entities
+    translated_text = translated_text.replace("<LESSTHAN>", "&lt;").replace("<GREATERTHAN>", "&gt;")
+    return translated_text
@@ -0,0 +1,158 @@
+"""
+Translation Memory
+
+A local store of previously translated source/target pairs with a character n-gram
+index, so that exact repeats and near-duplicates (e.g. "Jar of Berries" / "Jar of
+Mushrooms") can be found without going through the translation API.
+"""
+
+import os
+import re
+import math
+import json
+
+# Default configuration
+DEFAULT_MEMORY_PATH = "translation_memory.json"
+DEFAULT_REUSE_THRESHOLD = None  # Only exact matches are reused unless a similarity threshold is given
+DEFAULT_SUGGEST_THRESHOLD = 0.7  # Similarity above which a fuzzy match is offered as a suggestion
+NGRAM_SIZE = 3
+
+NUMBER_RE = re.compile(r"\d+")
+
+def exact_key(text):
+    """Key for exact matches: the text with collapsed whitespace, case preserved."""
+    return " ".join(text.split())
+
+def normalize_text(text):
+    """Normalize text for n-gram matching: lowercase with collapsed whitespace."""
+    return " ".join(text.lower().split())
+
+def text_ngrams(text, n=NGRAM_SIZE):
+    """Return the set of character n-grams of normalized, space-padded text."""
+    padded = f" {normalize_text(text)} "
+    if len(padded) <= n:
+        return frozenset([padded])
+    return frozenset(padded[i:i + n] for i in range(len(padded) - n + 1))
+
+def similarity(grams_a, grams_b):
+    """Dice coefficient of two n-gram sets."""
+    if not grams_a or not grams_b:
+        return 0.0
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+def new_memory(path, src_lang, target_lang):
+    """Create an empty translation memory for one language pair."""
+    return {
+        'path': path,
+        'lang_pair': f"{src_lang}|{target_lang}",
+        'stored': {},  # Raw file contents, so other language pairs survive a save
+        'entries': [],  # [source, target, n-grams]
+        'exact': {},  # source with collapsed whitespace -> entry id
+        'index': {},  # n-gram -> [entry ids]
+        'dirty': False
+    }
+
+def load_memory(path, src_lang, target_lang):
+    """Load the translation memory file and index the pairs for src_lang -> target_lang."""
+    memory = new_memory(path, src_lang, target_lang)
+    if path and os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                memory['stored'] = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable translation memory {path}: {str(e)}")
+
+    for source, target in memory['stored'].get(memory['lang_pair'], {}).items():
+        add_translation(memory, source, target)
+    memory['dirty'] = False
+    return memory
+
+def save_memory(memory):
+    """Write the translation memory back to its file if it changed."""
+    if not memory['path'] or not memory['dirty']:
+        return
+    memory['stored'][memory['lang_pair']] = {source: target for source, target, _ in memory['entries']}
+    temp_path = f"{memory['path']}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(memory['stored'], f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temp_path, memory['path'])
+    memory['dirty'] = False
+
+def add_translation(memory, source, target):
+    """Add or update a source/target pair."""
+    if not source or not source.strip() or target is None:
+        return
+    key = exact_key(source)
+    entry_id = memory['exact'].get(key)
+    if entry_id is not None:
+        if memory['entries'][entry_id][1] != target:
+            memory['entries'][entry_id][1] = target
+            memory['dirty'] = True
+        return
+
+    grams = text_ngrams(source)
+    entry_id = len(memory['entries'])
+    memory['entries'].append([source, target, grams])
+    memory['exact'][key] = entry_id
+    for gram in grams:
+        memory['index'].setdefault(gram, []).append(entry_id)
+    memory['dirty'] = True
+
+def find_similar(memory, text, threshold=DEFAULT_SUGGEST_THRESHOLD, limit=3):
+    """
+    Return up to limit (score, source, target) matches with similarity >= threshold, best first.
+
+    Only the rarest n-grams of the query are looked up in the index (prefix filtering):
+    any entry reaching the threshold must share at least one of them, so candidates
+    come from a few short posting lists instead of a scan of the whole memory.
+    """
+    grams = text_ngrams(text)
+    if not memory['entries'] or threshold <= 0:
+        return []
+
+    # Minimum overlap and length bounds for a Dice score >= threshold
+    min_overlap = math.ceil(threshold * len(grams) / (2 - threshold) - 1e-9)
+    min_len = threshold * len(grams) / (2 - threshold)
+    max_len = len(grams) * (2 - threshold) / threshold
+
+    index = memory['index']
+    probe = sorted(grams, key=lambda gram: len(index.get(gram, ())))
+    probe = probe[:len(grams) - min_overlap + 1]
+
+    candidates = set()
+    for gram in probe:
+        candidates.update(index.get(gram, ()))
+
+    matches = []
+    for entry_id in candidates:
+        source, target, entry_grams = memory['entries'][entry_id]
+        if not min_len <= len(entry_grams) <= max_len:
+            continue
+        score = similarity(grams, entry_grams)
+        if score >= threshold:
+            matches.append((score, source, target))
+
+    matches.sort(key=lambda match: (-match[0], match[1]))
+    return matches[:limit]
+
+def lookup(memory, text, threshold=DEFAULT_REUSE_THRESHOLD):
+    """
+    Find a translation that can be reused for text.
+
+    Returns (target, score, source) for an exact match (score 1.0), or None. Fuzzy
+    matches are only reused if a threshold is given, and only when they contain the
+    same numbers as text, since "20 cans" must never get the translation of "10 cans".
+    """
+    if memory is None or not text or not text.strip():
+        return None
+    entry_id = memory['exact'].get(exact_key(text))
+    if entry_id is not None:
+        source, target, _ = memory['entries'][entry_id]
+        return target, 1.0, source
+    if threshold is None:
+        return None
+    numbers = NUMBER_RE.findall(text)
+    for score, source, target in find_similar(memory, text, threshold, limit=None):
+        if NUMBER_RE.findall(source) == numbers:
+            return target, score, source
+    return None
@@ -0,0 +1,211 @@
+"""
+Translation Pipeline
+
+A streaming API for translating mod XML files, made of generator stages:
+
+    discover_files -> parse_documents -> extract_columns -> translate_documents -> write_documents
+
+Each stage pulls from the previous one only as fast as it is consumed, so a caller can
+feed an iterable of paths, bytes or binary streams and handle each translated document
+as soon as it is done, without loading a whole mod tree into memory. translate_sources()
+chains the stages for the common case.
+
+Example:
+
+    for document in translate_sources(discover_files("Mods"), my_translate_function):
+        print(document['name'], len(document['columns']), document['error'])
+"""
+
+import io
+import os
+import shutil
+import time
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from run_profiler import phase
+
+# Default configuration
+DEFAULT_FIELDS_TO_TRANSLATE = ["strName", "strDesc"]
+DEFAULT_BATCH_SIZE = 5  # Strings translated per batch; bounds the work held in memory
+
+def discover_files(root_dir, include_pattern=None, exclude_pattern=None):
+    """Yield XML files in the given directory and its subdirectories as they are found."""
+    for dirpath, _, filenames in os.walk(root_dir):
+        for filename in filenames:
+            if not filename.endswith('.xml'):
+                continue
+
+            file_path = os.path.join(dirpath, filename)
+
+            # Apply include/exclude filters
+            if include_pattern and include_pattern not in file_path:
+                continue
+            if exclude_pattern and exclude_pattern in file_path:
+                continue
+
+            yield file_path
+
+def find_translatable_columns(root, fields_to_translate):
+    """Return the column elements under root whose text should be translated."""
+    columns = []
+    for table in root.findall(".//table"):
+        for column in table.findall("column"):
+            if column.get("name") in fields_to_translate and column.text:
+                columns.append(column)
+    return columns
+
+def parse_documents(sources):
+    """
+    Parse each source into a document dict.
+
+    A source is a file path, XML bytes, or a binary file object. Documents that fail
+    to parse are still yielded, with 'error' set, so one bad file does not stop the run.
+    """
+    for index, source in enumerate(sources):
+        document = {
+            'name': None,
+            'path': None,
+            'tree': None,
+            'columns': [],
+            'error': None,
+            'translated_xml': None
+        }
+
+        if isinstance(source, (bytes, bytearray)):
+            document['name'] = f"<bytes {index}>"
+            stream = io.BytesIO(source)
+        elif hasattr(source, 'read'):
+            document['name'] = getattr(source, 'name', f"<stream {index}>")
+            stream = source
+        else:
+            document['path'] = os.fspath(source)
+            document['name'] = document['path']
+            stream = document['path']
+
+        try:
+            with phase("parse", file=document['name']):
+                document['tree'] = ET.parse(stream)
+        except (ET.ParseError, OSError) as e:
+            document['error'] = f"Error parsing {document['name']}: {str(e)}"
+
+        yield document
+
+def extract_columns(documents, fields_to_translate=DEFAULT_FIELDS_TO_TRANSLATE):
+    """Attach the columns to translate to each parsed document."""
+    for document in documents:
+        if document['tree'] is not None:
+            document['columns'] = find_translatable_columns(document['tree'].getroot(), fields_to_translate)
+        yield document
+
+def translate_documents(documents, translator, batch_size=DEFAULT_BATCH_SIZE, workers=1, batch_delay=0):
+    """
+    Translate the columns of each document in bounded batches.
+
+    translator is called with one source string and returns its translation. Strings
+    are collected into batches of at most batch_size across documents; with workers > 1
+    a batch is translated concurrently. Documents are yielded in input order as soon as
+    all of their columns are translated, and new documents are only pulled in when the
+    current batch has room, so at most one batch of strings is in flight at a time.
+    batch_delay seconds are slept between batches to avoid rate limiting.
+    """
+    pending = deque()  # [document, columns left]
+    batch = []  # (pending entry, column)
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    batches_done = 0
+
+    def translate_one(text):
+        try:
+            return translator(text), None
+        except Exception as e:
+            return text, e
+
+    def run_batch():
+        texts = [column.text for _, column in batch]
+        if executor:
+            results = list(executor.map(translate_one, texts))
+        else:
+            results = [translate_one(text) for text in texts]
+        for (entry, column), (translated_text, error) in zip(batch, results):
+            if error is not None:
+                entry[0]['error'] = f"Error translating {entry[0]['name']}: {str(error)}"
+            else:
+                column.text = translated_text
+            entry[1] -= 1
+        batch.clear()
+
+    try:
+        for document in documents:
+            entry = [document, len(document['columns'])]
+            pending.append(entry)
+            for column in document['columns']:
+                batch.append((entry, column))
+                if len(batch) >= batch_size:
+                    if batches_done and batch_delay:
+                        time.sleep(batch_delay)
+                    run_batch()
+                    batches_done += 1
+                    while pending and pending[0][1] == 0:
+                        yield pending.popleft()[0]
+
+            while pending and pending[0][1] == 0:
+                yield pending.popleft()[0]
+
+        if batch:
+            if batches_done and batch_delay:
+                time.sleep(batch_delay)
+            run_batch()
+        while pending:
+            yield pending.popleft()[0]
+    finally:
+        if executor:
+            executor.shutdown()
+
+def write_documents(documents, backup_suffix=None):
+    """
+    Save each translated document.
+
+    Documents read from a path are written back in place, after copying the original to
+    <path>.<backup_suffix> if a suffix is given and no backup exists yet. Documents read
+    from bytes or streams get their UTF-8 XML in document['translated_xml'] instead.
+    """
+    for document in documents:
+        # Nothing to save for failed documents or documents without text to translate
+        if document['tree'] is None or document['error'] or not document['columns']:
+            yield document
+            continue
+
+        try:
+            with phase("write", file=document['name']):
+                if document['path']:
+                    if backup_suffix:
+                        backup_path = f"{document['path']}.{backup_suffix}"
+                        if not os.path.exists(backup_path):
+                            shutil.copy2(document['path'], backup_path)
+                    document['tree'].write(document['path'], encoding="utf-8", xml_declaration=True)
+                else:
+                    output = io.BytesIO()
+                    document['tree'].write(output, encoding="utf-8", xml_declaration=True)
+                    document['translated_xml'] = output.getvalue()
+        except OSError as e:
+            document['error'] = f"Error writing {document['name']}: {str(e)}"
+
+        yield document
+
+def describe_document(document):
+    """Return a one-line summary of what happened to a finished document."""
+    if document['error']:
+        return document['error']
+    if not document['columns']:
+        return f"No text to translate in {document['name']}"
+    return f"Translated {len(document['columns'])} elements in {document['name']}"
+
+def translate_sources(sources, translator, fields_to_translate=DEFAULT_FIELDS_TO_TRANSLATE, batch_size=DEFAULT_BATCH_SIZE,
+                      workers=1, batch_delay=0, backup_suffix=None, write=True):
+    """Run the whole pipeline over sources and yield each finished document."""
+    documents = extract_columns(parse_documents(sources), fields_to_translate)
+    documents = translate_documents(documents, translator, batch_size, workers, batch_delay)
+    if write:
+        documents = write_documents(documents, backup_suffix)
+    return documents
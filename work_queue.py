@@ -0,0 +1,146 @@
+"""
+Translation Work Queue
+
+A SQLite-backed queue of leased work units for spreading a translation run over several
+worker processes. The coordinator splits the unique strings into units; workers claim a unit,
+which leases it to them for a limited time, renew the lease while they work, and report
+the translations back. A unit whose lease expires is handed to the next worker that asks.
+
+SQLite relies on file locking, which is not reliable on network filesystems, so this queue
+is only for workers on a single host and for testing. Use directory_queue.py, which has
+the same functions, to share a queue between machines.
+"""
+
+import json
+import time
+import sqlite3
+
+# Default configuration
+DEFAULT_UNIT_SIZE = 50  # Strings per work unit
+DEFAULT_LEASE_SECONDS = 300  # How long a claimed unit stays with its worker without a renewal
+QUEUE_POLL_SECONDS = 5
+CONNECT_TIMEOUT = 30  # Seconds to wait for another process holding the database lock
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS job (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS units (
+    id INTEGER PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT
+);
+"""
+
+def open_queue(queue_path):
+    """Open (and create if needed) the queue database."""
+    connection = sqlite3.connect(queue_path, timeout=CONNECT_TIMEOUT, isolation_level=None)
+    connection.executescript(SCHEMA)
+    return connection
+
+def set_job(connection, settings):
+    """Store the job settings (languages, API, ...) that workers should use."""
+    with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        for key, value in settings.items():
+            connection.execute(
+                "INSERT OR REPLACE INTO job (key, value) VALUES (?, ?)", (key, json.dumps(value))
+            )
+
+def get_job(connection):
+    """Return the job settings stored by the coordinator."""
+    return {key: json.loads(value) for key, value in connection.execute("SELECT key, value FROM job")}
+
+def enqueue_strings(connection, strings, unit_size=DEFAULT_UNIT_SIZE):
+    """
+    Split strings into work units of at most unit_size and add them to the queue.
+
+    The 'queued' job setting is set in the same transaction, so workers can tell a
+    finished queue (even one with no units) from one the coordinator has not filled yet.
+    """
+    strings = list(strings)
+    with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        for i in range(0, len(strings), unit_size):
+            connection.execute(
+                "INSERT INTO units (payload) VALUES (?)", (json.dumps(strings[i:i + unit_size]),)
+            )
+        connection.execute(
+            "INSERT OR REPLACE INTO job (key, value) VALUES ('queued', ?)", (json.dumps(True),)
+        )
+    return -(-len(strings) // unit_size)
+
+def is_queued(connection):
+    """Return True once the coordinator has queued all of its work units."""
+    return bool(get_job(connection).get('queued'))
+
+def claim_unit(connection, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """
+    Lease the next pending unit, or a unit whose lease has expired, to worker.
+
+    Returns (unit id, [strings]) or None if no unit is available right now.
+    """
+    now = time.time()
+    with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        row = connection.execute(
+            "SELECT id, payload FROM units "
+            "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+            "ORDER BY id LIMIT 1",
+            (now,)
+        ).fetchone()
+        if row is None:
+            return None
+        connection.execute(
+            "UPDATE units SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+            (worker, now + lease_seconds, row[0])
+        )
+    return row[0], json.loads(row[1])
+
+def renew_lease(connection, unit_id, worker, lease_seconds=DEFAULT_LEASE_SECONDS):
+    """Extend a lease; returns False if the unit was reclaimed by another worker."""
+    cursor = connection.execute(
+        "UPDATE units SET lease_expires = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+        (time.time() + lease_seconds, unit_id, worker)
+    )
+    return cursor.rowcount == 1
+
+def complete_unit(connection, unit_id, worker, translations):
+    """Store the translations for a leased unit; returns False if the lease was lost."""
+    cursor = connection.execute(
+        "UPDATE units SET status = 'done', result = ?, lease_expires = NULL "
+        "WHERE id = ? AND worker = ? AND status = 'leased'",
+        (json.dumps(translations), unit_id, worker)
+    )
+    return cursor.rowcount == 1
+
+def release_unit(connection, unit_id, worker):
+    """Give up a leased unit so any worker can claim it again; returns False if the lease was lost."""
+    cursor = connection.execute(
+        "UPDATE units SET status = 'pending', worker = NULL, lease_expires = NULL "
+        "WHERE id = ? AND worker = ? AND status = 'leased'",
+        (unit_id, worker)
+    )
+    return cursor.rowcount == 1
+
+def queue_progress(connection):
+    """Return {'pending': n, 'leased': n, 'expired': n, 'done': n} for the queue."""
+    progress = {'pending': 0, 'leased': 0, 'expired': 0, 'done': 0}
+    now = time.time()
+    for status, lease_expires in connection.execute("SELECT status, lease_expires FROM units"):
+        if status == 'leased' and lease_expires < now:
+            status = 'expired'
+        progress[status] += 1
+    return progress
+
+def collect_translations(connection):
+    """Return {source: translation} from every finished unit."""
+    translations = {}
+    for payload, result in connection.execute("SELECT payload, result FROM units WHERE status = 'done'"):
+        translations.update(zip(json.loads(payload), json.loads(result)))
+    return translations
@@ -11,14 +11,25 @@ import sys
 import xml.etree.ElementTree as ET
 import argparse
 import time
-import requests
+import socket
 from tqdm import tqdm
 
-try:
-    from google.cloud import translate_v2 as google_translate
-    GOOGLE_TRANSLATE_AVAILABLE = True
-except ImportError:
-    GOOGLE_TRANSLATE_AVAILABLE = False
+from translation_memory import (
+    DEFAULT_REUSE_THRESHOLD, DEFAULT_SUGGEST_THRESHOLD, load_memory, save_memory,
+    add_translation, lookup, find_similar
+)
+from translation_pipeline import (
+    discover_files, parse_documents, extract_columns, translate_documents,
+    write_documents, translate_sources, describe_document
+)
+from translation_api import GOOGLE_TRANSLATE_AVAILABLE, TranslationError, translate_text
+import work_queue
+import directory_queue
+from work_queue import DEFAULT_UNIT_SIZE, DEFAULT_LEASE_SECONDS, QUEUE_POLL_SECONDS
+from run_profiler import (
+    DEFAULT_TRACE_PATH, start_profile, stop_profile, phase, phase_iter, file_span, record_file, record_request,
+    print_profile_summary, write_trace
+)
 
 # Default configuration
 DEFAULT_SRC_LANG = "en"
@@ -26,138 +37,420 @@ DEFAULT_TARGET_LANG = "ru"
 DEFAULT_FIELDS_TO_TRANSLATE = ["strName", "strDesc"]
 DEFAULT_XML_FILES_PATH = "Mods"
 DEFAULT_API = "mymemory"  # Options: mymemory, google
-DEFAULT_MYMEMORY_API_URL = "https://api.mymemory.translated.net/get"
+DEFAULT_KEY_FIELDS = ["nID", "strID", "id"]  # Columns that identify a row across mod versions
+SQLITE_QUEUE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
 
 def find_all_xml_files(root_dir, include_pattern=None, exclude_pattern=None):
     """Find all XML files in the given directory and its subdirectories."""
-    xml_files = []
-    for dirpath, _, filenames in os.walk(root_dir):
-        for filename in filenames:
-            if not filename.endswith('.xml'):
-                continue
-                
-            file_path = os.path.join(dirpath, filename)
-            
-            # Apply include/exclude filters
-            if include_pattern and include_pattern not in file_path:
-                continue
-            if exclude_pattern and exclude_pattern in file_path:
-                continue
-                
-            xml_files.append(file_path)
-    return xml_files
-
-def translate_with_mymemory(text, src_lang, target_lang, api_url=DEFAULT_MYMEMORY_API_URL):
-    """Translate text using MyMemory Translation API."""
-    if not text or text.strip() == "":
-        return text
-    
-    params = {
-        'q': text,
-        'langpair': f'{src_lang}|{target_lang}'
-    }
-    
-    try:
-        response = requests.get(api_url, params=params)
-        response_json = response.json()
-        
-        if response.status_code == 200 and response_json['responseStatus'] == 200:
-            translated_text = response_json['responseData']['translatedText']
-            return translated_text
-        else:
-            print(f"Translation error: {response_json.get('responseDetails', 'Unknown error')}")
-            return text
-    except Exception as e:
-        print(f"Error during translation: {str(e)}")
-        return text
+    return list(discover_files(root_dir, include_pattern, exclude_pattern))
 
-def translate_with_google(text, src_lang, target_lang):
-    """Translate text using Google Translate API."""
-    if not text or text.strip() == "":
-        return text
-    
-    try:
-        translate_client = google_translate.Client()
-        result = translate_client.translate(
-            text, 
-            target_language=target_lang,
-            source_language=src_lang
+def translate_with_memory(text, src_lang, target_lang, api, memory=None, reuse_threshold=DEFAULT_REUSE_THRESHOLD, remember=True, raise_errors=False):
+    """
+    Translate text, reusing a translation from memory when possible.
+
+    New translations are added to memory unless remember is False (dry runs). A failed
+    request keeps the original text, or raises TranslationError if raise_errors is set.
+    Returns (translated_text, used_api) so callers only wait between real API requests.
+    """
+    # Blank text is never sent to the API, so it is not a request and needs no delay
+    if not text or not text.strip():
+        return text, False
+
+    with phase("memory"):
+        match = lookup(memory, text, reuse_threshold)
+    if match:
+        return match[0], False
+
+    with phase("request"):
+        start = time.perf_counter()
+        try:
+            translated_text = translate_text(text, src_lang, target_lang, api, raise_errors=True)
+        except TranslationError as e:
+            record_request(time.perf_counter() - start, text, failed=True)
+            if raise_errors:
+                raise
+            # The original text is kept, and must not be remembered
+            print(str(e))
+            return text, True
+        record_request(time.perf_counter() - start, text)
+    if memory is not None and remember:
+        add_translation(memory, text, translated_text)
+    return translated_text, True
+
+def describe_suggestion(memory, text):
+    """Describe the closest translation memory match for text, or return an empty string."""
+    if memory is None:
+        return ""
+    matches = find_similar(memory, text, DEFAULT_SUGGEST_THRESHOLD, limit=1)
+    if not matches:
+        return ""
+    score, source, target = matches[0]
+    return f" (suggestion: {target} from \"{source}\", {score:.0%} similar)"
+
+def make_translator(src_lang, target_lang, api, dry_run, delay, memory=None, reuse_threshold=DEFAULT_REUSE_THRESHOLD, raise_errors=False):
+    """
+    Return a function that translates one string, for the translation pipeline.
+
+    It reuses translations from memory, waits delay seconds after each API request to
+    avoid rate limiting, and on a dry run prints each translation (with the closest
+    memory suggestion) without adding it to memory. With raise_errors, a failed request
+    raises TranslationError instead of keeping the original text.
+    """
+    def translate(text):
+        suggestion = describe_suggestion(memory, text) if dry_run else ""
+        translated_text, used_api = translate_with_memory(
+            text, src_lang, target_lang, api, memory, reuse_threshold, not dry_run, raise_errors
         )
-        
-        translated_text = result['translatedText']
+
+        if dry_run:
+            print(f"Would translate: {text} -> {translated_text}{suggestion if used_api else ''}")
+
+        # Avoid rate limiting
+        if used_api:
+            with phase("sleep"):
+                time.sleep(delay)
         return translated_text
-    except Exception as e:
-        print(f"Error during Google translation: {str(e)}")
-        return text
 
-def translate_text(text, src_lang, target_lang, api="mymemory"):
-    """Translate text using the specified API."""
-    if not text or text.strip() == "":
-        return text
-    
-    # Replace XML entities to prevent translation issues
-    text = text.replace("&lt;", "<LESSTHAN>").replace("&gt;", "<GREATERTHAN>")
-    
-    if api == "google" and GOOGLE_TRANSLATE_AVAILABLE:
-        translated_text = translate_with_google(text, src_lang, target_lang)
-    else:
-        translated_text = translate_with_mymemory(text, src_lang, target_lang)
-    
-    # Restore XML entities
-    translated_text = translated_text.replace("<LESSTHAN>", "&lt;").replace("<GREATERTHAN>", "&gt;")
-    return translated_text
+    return translate
 
-def translate_xml_file(xml_file_path, src_lang, target_lang, fields_to_translate, api, backup_suffix, dry_run, delay):
+def translate_xml_files(xml_files, src_lang, target_lang, fields_to_translate, api, backup_suffix, dry_run, delay, memory=None, reuse_threshold=DEFAULT_REUSE_THRESHOLD):
+    """
+    Translate XML files through the translation pipeline and yield each finished document.
+
+    Files are pulled from xml_files one at a time, so a generator of paths is translated
+    while it is still being walked. Each file gets a progress bar and a summary line.
+    Nothing is written on a dry run.
+    """
+    started = {}
+    new_backups = set()
+    progress = {'bar': None}
+    translator = make_translator(src_lang, target_lang, api, dry_run, delay, memory, reuse_threshold)
+
+    def start_files(files):
+        for xml_file in files:
+            print(f"Processing {xml_file}")
+            started[xml_file] = time.perf_counter()
+            yield xml_file
+
+    def start_progress(documents):
+        for document in documents:
+            if document['columns']:
+                print(f"Found {len(document['columns'])} elements to translate")
+                if not dry_run and not os.path.exists(f"{document['path']}.{backup_suffix}"):
+                    new_backups.add(document['path'])
+                progress['bar'] = tqdm(total=len(document['columns']), desc="Translating")
+            yield document
+
+    def translate(text):
+        try:
+            return translator(text)
+        finally:
+            progress['bar'].update(1)
+
+    # One string per batch, so each document is finished before the next file is read
+    documents = extract_columns(parse_documents(start_files(xml_files)), fields_to_translate)
+    documents = translate_documents(start_progress(documents), translate, batch_size=1)
+    if not dry_run:
+        documents = write_documents(documents, backup_suffix)
+
+    for document in documents:
+        if progress['bar'] is not None:
+            progress['bar'].close()
+            progress['bar'] = None
+
+        if document['error'] or not document['columns']:
+            print(describe_document(document))
+        elif dry_run:
+            print(f"{describe_document(document)} (dry run, not saved)")
+        else:
+            if document['path'] in new_backups:
+                print(f"Created backup at {document['path']}.{backup_suffix}")
+            print(f"Saved translated XML to {document['path']}")
+        new_backups.discard(document['path'])
+
+        record_file(document['path'], started.pop(document['path']))
+        yield document
+
+def translate_xml_file(xml_file_path, src_lang, target_lang, fields_to_translate, api, backup_suffix, dry_run, delay, memory=None, reuse_threshold=DEFAULT_REUSE_THRESHOLD):
     """Parse XML file, translate specified fields, and save the translated XML."""
-    print(f"Processing {xml_file_path}")
-    
-    try:
-        # Parse XML
-        tree = ET.parse(xml_file_path)
-        root = tree.getroot()
-        
-        # Count elements that need translation
-        elements_to_translate = []
-        for table in root.findall(".//table"):
+    for _ in translate_xml_files([xml_file_path], src_lang, target_lang, fields_to_translate, api, backup_suffix, dry_run, delay, memory, reuse_threshold):
+        pass
+
+def iter_translatable_columns(root, fields_to_translate, key_fields=DEFAULT_KEY_FIELDS):
+    """
+    Yield (key, column) for every column that needs translation.
+
+    The key identifies the column by table/row identity rather than by position in
+    the file: the chain of table names, each row's ID column (or its position if it
+    has none), and the column name. Tables are found at any depth, like ".//table";
+    other elements on the way are part of the chain as their tag and position.
+    """
+    seen = {}
+
+    def walk(element, path):
+        positions = {}
+        for child in element:
+            if child.tag == "column":
+                continue
+            index = positions.get(child.tag, 0)
+            positions[child.tag] = index + 1
+
+            if child.tag != "table":
+                yield from walk(child, path + (f"<{child.tag}>[{index}]",))
+                continue
+
+            table = child
+            row_id = f"[{index}]"
+            for column in table.findall("column"):
+                if column.get("name") in key_fields and column.text:
+                    row_id = f"[{column.get('name')}={column.text.strip()}]"
+                    break
+            table_path = path + ((table.get("name") or "") + row_id,)
+
             for column in table.findall("column"):
                 if column.get("name") in fields_to_translate and column.text:
-                    elements_to_translate.append(column)
-        
-        if not elements_to_translate:
-            print(f"No text to translate in {xml_file_path}")
+                    key = table_path + (column.get("name"),)
+                    # Keep keys unique if a file repeats an ID
+                    seen[key] = seen.get(key, 0) + 1
+                    if seen[key] > 1:
+                        key = key + (f"#{seen[key]}",)
+                    yield key, column
+
+            yield from walk(table, table_path)
+
+    yield from walk(root, ())
+
+def update_xml_file(xml_file_path, upstream_path, src_lang, target_lang, fields_to_translate, api, backup_suffix, dry_run, delay, memory=None, reuse_threshold=DEFAULT_REUSE_THRESHOLD):
+    """
+    Retranslate a previously translated XML file against a new upstream version.
+
+    The stored backup holds the original text the current translation was made from.
+    Columns whose upstream text is unchanged keep their existing translation; only new
+    or edited strings are sent to the translation API. Afterwards the backup is replaced
+    with the new upstream file so the next update compares against it. A file that has
+    not been translated yet is translated in full; a translated file without a backup is
+    left alone.
+    """
+    import shutil
+    print(f"Updating {xml_file_path} from {upstream_path}")
+
+    backup_path = f"{xml_file_path}.{backup_suffix}"
+    if not os.path.exists(backup_path) and os.path.exists(xml_file_path):
+        # Without the original text the existing translation cannot be matched, and
+        # translating from scratch would throw it away
+        print(
+            f"Error updating {xml_file_path}: no backup at {backup_path}, leaving the file unchanged. "
+            f"Set --backup-suffix to the suffix of its backup (e.g. google.backup for google_xml_translator.py)"
+        )
+        return
+    if not os.path.exists(backup_path):
+        print(f"No translation at {xml_file_path} yet, translating the whole file")
+        if dry_run:
+            translate_xml_file(upstream_path, src_lang, target_lang, fields_to_translate, api, backup_suffix, dry_run, delay, memory, reuse_threshold)
             return
-        
-        print(f"Found {len(elements_to_translate)} elements to translate")
-        
-        # Create backup of original file if not a dry run
-        if not dry_run:
-            backup_path = f"{xml_file_path}.{backup_suffix}"
-            if not os.path.exists(backup_path):
-                import shutil
-                shutil.copy2(xml_file_path, backup_path)
-                print(f"Created backup at {backup_path}")
-        
-        # Translate elements
+        os.makedirs(os.path.dirname(xml_file_path) or ".", exist_ok=True)
+        shutil.copy2(upstream_path, xml_file_path)
+        translate_xml_file(xml_file_path, src_lang, target_lang, fields_to_translate, api, backup_suffix, dry_run, delay, memory, reuse_threshold)
+        return
+
+    try:
+        with phase("parse", file=xml_file_path):
+            old_source = dict(
+                (key, column.text) for key, column in
+                iter_translatable_columns(ET.parse(backup_path).getroot(), fields_to_translate)
+            )
+            old_translation = dict(
+                (key, column.text) for key, column in
+                iter_translatable_columns(ET.parse(xml_file_path).getroot(), fields_to_translate)
+            )
+
+        # Identical source text elsewhere in the file can reuse its translation too
+        translation_by_text = {}
+        for key, text in old_source.items():
+            if key in old_translation:
+                translation_by_text.setdefault(text, old_translation[key])
+                if memory is not None and not dry_run and old_translation[key] != text:
+                    add_translation(memory, text, old_translation[key])
+
+        with phase("parse", file=upstream_path):
+            tree = ET.parse(upstream_path)
+        upstream_columns = list(iter_translatable_columns(tree.getroot(), fields_to_translate))
+
+        elements_to_translate = []
+        reused = 0
+        for key, column in upstream_columns:
+            if old_source.get(key) == column.text and key in old_translation:
+                column.text = old_translation[key]
+                reused += 1
+            elif column.text in translation_by_text:
+                column.text = translation_by_text[column.text]
+                reused += 1
+            else:
+                elements_to_translate.append(column)
+
+        print(f"Reused {reused} existing translations, {len(elements_to_translate)} new or edited elements to translate")
+
+        translator = make_translator(src_lang, target_lang, api, dry_run, delay, memory, reuse_threshold)
         for column in tqdm(elements_to_translate, desc="Translating"):
-            if column.text:
-                original_text = column.text
-                translated_text = translate_text(original_text, src_lang, target_lang, api)
-                
-                if dry_run:
-                    print(f"Would translate: {original_text} -> {translated_text}")
-                else:
-                    column.text = translated_text
-                
-                # Avoid rate limiting
-                time.sleep(delay)
-        
-        # Save translated XML if not a dry run
+            column.text = translator(column.text)
+
         if not dry_run:
-            tree.write(xml_file_path, encoding="utf-8", xml_declaration=True)
-            print(f"Saved translated XML to {xml_file_path}")
-        
+            # Replace the translation before the backup: if the update is interrupted in
+            # between, the next one compares against the old upstream text again and
+            # retranslates the edited rows instead of keeping their stale translations
+            temp_path = f"{xml_file_path}.tmp"
+            with phase("write", file=xml_file_path):
+                try:
+                    tree.write(temp_path, encoding="utf-8", xml_declaration=True)
+                    os.replace(temp_path, xml_file_path)
+                finally:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                shutil.copy2(upstream_path, backup_path)
+            print(f"Saved translated XML to {xml_file_path} and updated backup at {backup_path}")
+
     except Exception as e:
-        print(f"Error processing {xml_file_path}: {str(e)}")
+        print(f"Error updating {xml_file_path}: {str(e)}")
+
+def open_work_queue(queue_path):
+    """
+    Open a work queue and return (queue module, connection).
+
+    Paths ending in .db, .sqlite or .sqlite3 are SQLite queues (work_queue), which only
+    work on a single host and are meant for testing. Any other path is a directory queue
+    (directory_queue), which can be shared between machines.
+    """
+    queue = work_queue if queue_path.endswith(SQLITE_QUEUE_SUFFIXES) else directory_queue
+    return queue, queue.open_queue(queue_path)
+
+def run_coordinator(args, xml_files, memory):
+    """
+    Queue the unique strings of all XML files as work units, wait for the workers to
+    translate them, then write the translated XML files.
+    """
+    queue, connection = open_work_queue(args.coordinator)
+
+    # Collect unique strings, one file at a time
+    strings = {}
+    for document in extract_columns(parse_documents(xml_files), args.fields):
+        if document['error']:
+            print(document['error'])
+        for column in document['columns']:
+            strings.setdefault(column.text, None)
+
+    translations = {}
+    if memory is not None:
+        with phase("memory"):
+            for text in strings:
+                match = lookup(memory, text, args.reuse_threshold)
+                if match:
+                    translations[text] = match[0]
+
+    settings = {'src_lang': args.src_lang, 'target_lang': args.target_lang, 'api': args.api, 'fields': args.fields}
+    if queue.is_queued(connection):
+        # The queued translations are only usable for the same job
+        job = queue.get_job(connection)
+        mismatched = [key for key, value in settings.items() if job.get(key) != value]
+        if mismatched:
+            print(
+                f"Error: the work queue in {args.coordinator} was queued with different "
+                + ", ".join(f"{key} ({job.get(key)})" for key in mismatched)
+                + "; use a new queue or the same options"
+            )
+            sys.exit(1)
+        print(f"Resuming the work queue in {args.coordinator}")
+    else:
+        queue.set_job(connection, settings)
+        to_queue = [text for text in strings if text not in translations]
+        units = queue.enqueue_strings(connection, to_queue, args.unit_size)
+        print(f"Queued {len(to_queue)} unique strings in {units} work units ({len(translations)} reused from memory)")
+
+    # Wait for the workers
+    last_progress = None
+    while True:
+        progress = queue.queue_progress(connection)
+        if progress != last_progress:
+            print(
+                f"Work units: {progress['done']} done, {progress['leased']} leased, "
+                f"{progress['expired']} expired, {progress['pending']} pending"
+            )
+            last_progress = progress
+        if progress['done'] == sum(progress.values()):
+            break
+        with phase("wait"):
+            time.sleep(QUEUE_POLL_SECONDS)
+
+    queued = queue.collect_translations(connection)
+    translations.update(queued)
+    if memory is not None and not args.dry_run:
+        for source, target in queued.items():
+            add_translation(memory, source, target)
+        save_memory(memory)
+
+    # Assemble the translated files
+    documents = translate_sources(
+        xml_files,
+        lambda text: translations.get(text, text),
+        args.fields,
+        backup_suffix=args.backup_suffix,
+        write=not args.dry_run
+    )
+    for document in documents:
+        print(describe_document(document) + (" (dry run, not saved)" if args.dry_run else ""))
+
+def run_worker(args, memory):
+    """Claim work units from the queue, translate them and report back until every unit is done."""
+    queue, connection = open_work_queue(args.worker)
+    worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    print(f"Worker {worker_id} using the work queue in {args.worker}")
+    job = None
+
+    while True:
+        claimed = queue.claim_unit(connection, worker_id, args.lease_seconds)
+        if claimed is None:
+            progress = queue.queue_progress(connection)
+            if queue.is_queued(connection) and progress['done'] == sum(progress.values()):
+                print("All work units are done")
+                return
+            # Wait for the coordinator to queue units or for a lease to expire
+            with phase("wait"):
+                time.sleep(QUEUE_POLL_SECONDS)
+            continue
+
+        unit_id, strings = claimed
+        if job is None:
+            job = queue.get_job(connection)
+            # Raise on failed requests, so untranslated text is never reported as done
+            translator = make_translator(
+                job['src_lang'], job['target_lang'], job['api'], args.dry_run, args.delay, memory, args.reuse_threshold,
+                raise_errors=True
+            )
+        translations = []
+        error = None
+        try:
+            for text in tqdm(strings, desc=f"Unit {unit_id}"):
+                translations.append(translator(text))
+
+                if not queue.renew_lease(connection, unit_id, worker_id, args.lease_seconds):
+                    break
+        except TranslationError as e:
+            error = e
+
+        if error is not None:
+            queue.release_unit(connection, unit_id, worker_id)
+            print(f"Returned unit {unit_id} to the queue after a failed request: {str(error)}")
+        elif len(translations) == len(strings) and queue.complete_unit(connection, unit_id, worker_id, translations):
+            print(f"Finished unit {unit_id} ({len(strings)} strings)")
+        else:
+            print(f"Lost the lease on unit {unit_id}, another worker will finish it")
+
+        if memory is not None and not args.dry_run:
+            save_memory(memory)
+
+        if error is not None:
+            # The API is probably rate limiting this host, so back off before claiming again
+            with phase("wait"):
+                time.sleep(QUEUE_POLL_SECONDS)
 
 def main():
     parser = argparse.ArgumentParser(description="Translate XML files for mods")
@@ -172,9 +465,22 @@ def main():
     parser.add_argument("--delay", type=float, default=0.5, help="Delay between translation requests in seconds")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be translated without making changes")
     parser.add_argument("--file", help="Process a specific XML file instead of searching for files")
+    parser.add_argument("--memory", help="Translation memory file; reuses known translations instead of calling the API")
+    parser.add_argument("--reuse-threshold", type=float, default=DEFAULT_REUSE_THRESHOLD, help="Also reuse fuzzy matches from memory with at least this similarity (0-1) and the same numbers; by default only exact matches are reused")
+    parser.add_argument("--update-from", help="New upstream version of --file or --path; only new or edited strings are translated")
+    queue_mode = parser.add_mutually_exclusive_group()
+    queue_mode.add_argument("--coordinator", metavar="QUEUE", help="Queue the strings in the work queue QUEUE for workers and write the results; QUEUE is a shared directory, or a .db SQLite file for a single host")
+    queue_mode.add_argument("--worker", metavar="QUEUE", help="Translate work units from the work queue QUEUE (a shared directory or a .db SQLite file)")
+    parser.add_argument("--unit-size", type=int, default=DEFAULT_UNIT_SIZE, help="Strings per work unit (coordinator)")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS, help="Seconds before an unfinished work unit is given to another worker")
+    parser.add_argument("--worker-id", help="Name of this worker (default: <hostname>-<pid>)")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_TRACE_PATH, help=f"Print per-phase timings and write a Chrome trace file (default: {DEFAULT_TRACE_PATH})")
     
     args = parser.parse_args()
     
+    if args.update_from and (args.coordinator or args.worker):
+        parser.error("--update-from cannot be combined with --coordinator or --worker")
+    
     # Check if Google Translate is requested but not available
     if args.api == "google" and not GOOGLE_TRANSLATE_AVAILABLE:
         print("Error: Google Translate API requested but 'google-cloud-translate' package is not installed.")
@@ -190,6 +496,65 @@ def main():
         if proceed.lower() != 'y':
             sys.exit(1)
     
+    if args.profile:
+        start_profile()
+
+    try:
+        with phase("memory"):
+            memory = load_memory(args.memory, args.src_lang, args.target_lang) if args.memory else None
+        process_files(args, memory)
+    finally:
+        if args.profile:
+            profile = stop_profile()
+            print_profile_summary(profile)
+            write_trace(profile, args.profile)
+            print(f"Wrote trace to {args.profile}")
+
+def process_files(args, memory):
+    """Translate or update every XML file selected by the command-line arguments."""
+    if args.worker:
+        run_worker(args, memory)
+        return
+
+    # Update mode: pair each upstream file with its translated copy
+    if args.update_from:
+        if args.file:
+            if not os.path.isfile(args.update_from):
+                print(f"Error: {args.update_from} is not a valid XML file")
+                sys.exit(1)
+            file_pairs = [(args.file, args.update_from)]
+        else:
+            with phase("walk"):
+                upstream_files = find_all_xml_files(args.update_from, args.include, args.exclude)
+            file_pairs = [
+                (os.path.join(args.path, os.path.relpath(upstream_file, args.update_from)), upstream_file)
+                for upstream_file in upstream_files
+            ]
+
+        print(f"Found {len(file_pairs)} upstream XML files to process")
+
+        for xml_file, upstream_file in file_pairs:
+            with file_span(xml_file):
+                update_xml_file(
+                    xml_file,
+                    upstream_file,
+                    args.src_lang,
+                    args.target_lang,
+                    args.fields,
+                    args.api,
+                    args.backup_suffix,
+                    args.dry_run,
+                    args.delay,
+                    memory,
+                    args.reuse_threshold
+                )
+                if memory is not None and not args.dry_run:
+                    with phase("memory"):
+                        save_memory(memory)
+            print(f"Finished processing {xml_file}")
+            print("-" * 50)
+        return
+
     # Find XML files
     if args.file:
         if os.path.isfile(args.file) and args.file.endswith('.xml'):
@@ -197,24 +562,36 @@ def main():
         else:
             print(f"Error: {args.file} is not a valid XML file")
             sys.exit(1)
+    elif args.coordinator:
+        # The coordinator reads every file twice, so it needs the whole list
+        with phase("walk"):
+            xml_files = find_all_xml_files(args.path, args.include, args.exclude)
     else:
-        xml_files = find_all_xml_files(args.path, args.include, args.exclude)
+        xml_files = phase_iter("walk", discover_files(args.path, args.include, args.exclude))
     
-    print(f"Found {len(xml_files)} XML files to process")
+    if args.coordinator:
+        print(f"Found {len(xml_files)} XML files to process")
+        run_coordinator(args, xml_files, memory)
+        return
     
-    # Process each XML file
-    for xml_file in xml_files:
-        translate_xml_file(
-            xml_file, 
-            args.src_lang, 
-            args.target_lang, 
-            args.fields, 
-            args.api, 
-            args.backup_suffix, 
-            args.dry_run,
-            args.delay
-        )
-        print(f"Finished processing {xml_file}")
+    # Translate each XML file as it is found
+    documents = translate_xml_files(
+        xml_files,
+        args.src_lang,
+        args.target_lang,
+        args.fields,
+        args.api,
+        args.backup_suffix,
+        args.dry_run,
+        args.delay,
+        memory,
+        args.reuse_threshold
+    )
+    for document in documents:
+        if memory is not None and not args.dry_run:
+            with phase("memory"):
+                save_memory(memory)
+        print(f"Finished processing {document['name']}")
         print("-" * 50)
 
 if __name__ == "__main__":